@@ -5,11 +5,10 @@
 # ================================================================
 
 import streamlit as st
-import pandas as pd
 import duckdb
+import math
+import os
 import re
-import json
-import time
 
 # ================================================================
 # 1. APP TITLE + Fellowship Info
@@ -33,22 +32,82 @@ a **single natural-language Q&A interface**.
 # ================================================================
 # 2. LOAD DATA (Rainfall + Crop)
 # ================================================================
-# @st.cache_data
+DB_PATH = "samarth.duckdb"   # built once by `python ingest.py`
+# The connection and every cached result below live for the whole Streamlit
+# process, and the open connection locks samarth.duckdb: to rebuild it, stop the
+# app, run `python ingest.py`, then start the app again.
+PAGE_SIZE = 1000
+
+# Tables/columns the app queries; anything older than ingest.py's schema must be rebuilt
+REQUIRED_COLUMNS = {
+    "crop": {"state", "crop", "production_mt", "year", "state_lc"},
+    "rainfall": {"state", "year", "annual", "state_lc"},
+    "crop_top_by_state": {"state_lc", "crop", "total_prod"},
+}
+
+@st.cache_resource
 def load_data():
-    con = duckdb.connect(database='samarth.duckdb', read_only=False)
-
-    df_rain = pd.read_parquet("imd_rainfall.parquet")
-    df_crop = pd.read_parquet("crop_production.parquet")
-
-    con.execute("CREATE OR REPLACE TABLE rainfall AS SELECT * FROM df_rain;")
-    con.execute("CREATE OR REPLACE TABLE crop AS SELECT * FROM df_crop;")
-
-    return con, df_rain, df_crop
-
-con, df_rain, df_crop = load_data()
+    if not os.path.exists(DB_PATH):
+        st.error(f"❌ {DB_PATH} not found. Run `python ingest.py` first.")
+        st.stop()
+    con = duckdb.connect(database=DB_PATH, read_only=True)
+
+    found = {}
+    for table, column in con.execute("SELECT table_name, column_name FROM information_schema.columns;").fetchall():
+        found.setdefault(table, set()).add(column)
+    if any(not cols <= found.get(table, set()) for table, cols in REQUIRED_COLUMNS.items()):
+        con.close()
+        st.error(f"❌ {DB_PATH} was built by an older version of the app. Run `python ingest.py` first.")
+        st.stop()
+    return con
+
+# One shared read-only database for every session; each script run gets its own
+# cursor because a single DuckDB connection must not be used from several threads
+con = load_data().cursor()
+
+@st.cache_data
+def load_max_rain_year():
+    # Invariant for the read-only database, so planners never re-query it
+    return con.execute("SELECT MAX(year) FROM rainfall;").fetchone()[0]
+
+MAX_RAIN_YEAR = load_max_rain_year()
 
 st.success("✅ Datasets Loaded Successfully")
 
+@st.cache_data
+def crop_summary():
+    # One scan for all three headline numbers
+    return con.execute("""
+        SELECT SUM(production_mt), COUNT(DISTINCT crop), COUNT(DISTINCT state)
+        FROM crop;
+    """).fetchone()
+
+@st.cache_data
+def table_row_count(table_name):
+    return con.execute(f"SELECT COUNT(*) FROM {table_name};").fetchone()[0]
+
+@st.cache_data
+def table_page(table_name, page):
+    return con.execute(
+        f"SELECT * FROM {table_name} LIMIT ? OFFSET ?",
+        [PAGE_SIZE, (page - 1) * PAGE_SIZE],
+    ).fetch_arrow_table()
+
+with st.expander("📂 Dataset status"):
+    total_prod, n_crops, n_states = crop_summary()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Total production (t)", f"{int(total_prod or 0):,}")
+    c2.metric("Crops", n_crops)
+    c3.metric("States", n_states)
+
+    # Only the visible page is fetched and sent to the browser
+    table_name = st.radio("Table", ["crop", "rainfall"], horizontal=True)
+    n_pages = max(1, math.ceil(table_row_count(table_name) / PAGE_SIZE))
+    # Keyed per table so switching tables starts again at page 1
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages,
+                           value=1, step=1, key=f"page_{table_name}")
+    st.dataframe(table_page(table_name, page))
+
 # ================================================================
 # 3. SAMPLE QUESTIONS — Reviewer Friendly
 # ================================================================
@@ -77,56 +136,77 @@ Therefore cross-year correlation queries are disabled in this prototype.
 # ================================================================
 # 4. SIMPLE INTENT PARSER (Only Working Cases Enabled)
 # ================================================================
+_RE_TOP = re.compile(r"top\s+(\d+)\s+crops\s+in\s+([\w\s]+)")
+_RE_COMPARE = re.compile(r"compare.*rainfall.*(in|between)\s+([\w\s]+)\s+and\s+([\w\s]+)\s+for\s+last\s+(\d+)\s+years")
+_RE_RAIN_TREND = re.compile(r"trend.*rainfall.*in\s+([\w\s]+)\s+for\s+last\s+(\d+)\s+years")
+
+# State filters: exact match first, then the name as whole words inside a state or
+# IMD subdivision name ("karnataka" → "coastal karnataka", "himachal" → "himachal pradesh")
+_STATE_EXACT = "state_lc = ?"
+_STATE_WORDS = "contains(' ' || state_lc || ' ', ' ' || ? || ' ')"
+
+def _top_crops_sql(state_filter):
+    return f"""
+        SELECT crop, SUM(total_prod) AS total_prod
+        FROM crop_top_by_state
+        WHERE {state_filter}
+        GROUP BY crop
+        ORDER BY total_prod DESC
+        LIMIT ?;
+    """
+
+def _rain_trend_sql(state_filter):
+    return f"""
+        SELECT state, year, annual AS rainfall_mm
+        FROM rainfall
+        WHERE {state_filter}
+          AND year BETWEEN ? AND ?
+        ORDER BY state, year;
+    """
+
+# Literal prefix of each pattern → the pattern, tried in this order
+_DISPATCH = {"top": _RE_TOP, "compare": _RE_COMPARE, "trend": _RE_RAIN_TREND}
+
 def samarth_plan(q: str):
-    q = q.lower().strip()
+    # q is already lowercased and whitespace-collapsed by the caller (it is also the cache key)
+
+    # Only run a pattern whose literal prefix occurs in the question;
+    # questions with none of them return without running any regex
+    for keyword, pat in _DISPATCH.items():
+        if keyword in q and (m := pat.search(q)):
+            break
+    else:
+        return {"intent": "unknown"}
 
     # TOP N CROPS IN A STATE
-    m = re.search(r"top\s+(\d+)\s+crops\s+in\s+([\w\s]+)", q)
-    if m:
+    if keyword == "top":
         n, state = int(m.group(1)), m.group(2).strip()
-        sql = f"""
-            SELECT crop, SUM(production_mt) AS total_prod
-            FROM crop
-            WHERE LOWER(state) LIKE '%{state.lower()}%'
-            GROUP BY crop
-            ORDER BY total_prod DESC
-            LIMIT {n};
-        """
-        return {"intent": "top_crops", "sql": sql, "state": state, "n": n}
+        return {"intent": "top_crops", "sql": _top_crops_sql(_STATE_EXACT), "fallback_sql": _top_crops_sql(_STATE_WORDS),
+                "params": [state, n], "state": state, "n": n}
 
     # RAINFALL COMPARISON
-    m = re.search(r"compare.*rainfall.*(in|between)\s+([\w\s]+)\s+and\s+([\w\s]+)\s+for\s+last\s+(\d+)\s+years", q)
-    if m:
+    if keyword == "compare":
         s1, s2, years = m.group(2).strip(), m.group(3).strip(), int(m.group(4))
-        max_year = con.execute("SELECT MAX(year) FROM rainfall").fetchone()[0]
-        min_year = max_year - years + 1
+        min_year = MAX_RAIN_YEAR - years + 1
 
-        sql = f"""
+        sql = """
             SELECT state, AVG(annual) AS avg_rain
             FROM rainfall
-            WHERE LOWER(state) IN ('{s1.lower()}', '{s2.lower()}')
-              AND year BETWEEN {min_year} AND {max_year}
+            WHERE state_lc IN (?, ?)
+              AND year BETWEEN ? AND ?
             GROUP BY state;
         """
-        return {"intent": "compare_rain", "sql": sql, "states": (s1, s2), "years": (min_year, max_year)}
+        params = [s1, s2, min_year, MAX_RAIN_YEAR]
+        return {"intent": "compare_rain", "sql": sql, "params": params, "states": (s1, s2), "years": (min_year, MAX_RAIN_YEAR)}
 
     # RAINFALL TREND
-    m = re.search(r"trend.*rainfall.*in\s+([\w\s]+)\s+for\s+last\s+(\d+)\s+years", q)
-    if m:
+    if keyword == "trend":
         state, years = m.group(1).strip(), int(m.group(2))
-        max_year = con.execute("SELECT MAX(year) FROM rainfall").fetchone()[0]
-        min_year = max_year - years + 1
-
-        sql = f"""
-            SELECT year, annual AS rainfall_mm
-            FROM rainfall
-            WHERE LOWER(state) LIKE '%{state.lower()}%'
-              AND year BETWEEN {min_year} AND {max_year}
-            ORDER BY year;
-        """
-        return {"intent": "rain_trend", "sql": sql, "state": state, "years": (min_year, max_year)}
+        min_year = MAX_RAIN_YEAR - years + 1
 
-    return {"intent": "unknown"}
+        params = [state, min_year, MAX_RAIN_YEAR]
+        return {"intent": "rain_trend", "sql": _rain_trend_sql(_STATE_EXACT), "fallback_sql": _rain_trend_sql(_STATE_WORDS),
+                "params": params, "state": state, "years": (min_year, MAX_RAIN_YEAR)}
 
 # ================================================================
 # 5. EXECUTOR + ANSWER GENERATOR
@@ -135,42 +215,62 @@ def execute_plan(plan):
     if plan["intent"] == "unknown":
         return "⚠️ Unknown question. Try using the sample questions above.", None
 
-    df = con.execute(plan["sql"]).df()
+    # Arrow tables go straight to st.dataframe, skipping the pandas conversion
+    tbl = con.execute(plan["sql"], plan["params"]).fetch_arrow_table()
+
+    # Exact state match first; fall back to a whole-word match inside the name
+    if tbl.num_rows == 0 and "fallback_sql" in plan:
+        tbl = con.execute(plan["fallback_sql"], plan["params"]).fetch_arrow_table()
 
     # HANDLE: TOP CROPS
     if plan["intent"] == "top_crops":
-        if df.empty:
+        if tbl.num_rows == 0:
             return "No crop data found for that state.", None
 
-        text = f"### ✅ Top {plan['n']} Crops in **{plan['state'].title()}**\n"
-        for _, r in df.iterrows():
-            text += f"- **{r['crop']}** — {int(r['total_prod'])} tonnes\n"
-        text += "\n📌 *Source: Crop Production 2022 Dataset*"
-        return text, df
+        lines = "\n".join(
+            f"- **{c}** — {int(p)} tonnes"
+            for c, p in zip(tbl["crop"].to_pylist(), tbl["total_prod"].to_pylist())
+        )
+        text = (
+            f"### ✅ Top {plan['n']} Crops in **{plan['state'].title()}**\n"
+            f"{lines}\n"
+            "\n📌 *Source: Crop Production 2022 Dataset*"
+        )
+        return text, tbl
 
     # HANDLE: RAINFALL COMPARISON
     if plan["intent"] == "compare_rain":
-        if df.empty:
+        if tbl.num_rows == 0:
             return "No rainfall data found for those states.", None
 
         s1, s2 = plan["states"]
         y1, y2 = plan["years"]
-        text = f"### 🌧 Rainfall Comparison ({y1}–{y2})\n"
-        for _, r in df.iterrows():
-            text += f"- **{r['state']}** — {round(r['avg_rain'],1)} mm\n"
-        text += "\n📌 *Source: IMD Rainfall Dataset (1901–2017)*"
-        return text, df
+        lines = "\n".join(
+            f"- **{state}** — {round(r, 1)} mm"
+            for state, r in zip(tbl["state"].to_pylist(), tbl["avg_rain"].to_pylist())
+        )
+        text = (
+            f"### 🌧 Rainfall Comparison ({y1}–{y2})\n"
+            f"{lines}\n"
+            "\n📌 *Source: IMD Rainfall Dataset (1901–2017)*"
+        )
+        return text, tbl
 
     # HANDLE: RAINFALL TREND
     if plan["intent"] == "rain_trend":
-        if df.empty:
+        if tbl.num_rows == 0:
             return "No rainfall data found for that state.", None
 
         text = f"### 📉 Rainfall Trend in **{plan['state'].title()}** ({plan['years'][0]}–{plan['years'][1]})"
-        return text, df
+        return text, tbl
 
     return "⚠️ Not implemented.", None
 
+@st.cache_data(ttl=3600, max_entries=256)
+def answer_query(q_normalized: str):
+    # Identical questions (across reruns and sessions) reuse the cached answer + Arrow table
+    return execute_plan(samarth_plan(q_normalized))
+
 # ================================================================
 # 6. MAIN USER INPUT BOX
 # ================================================================
@@ -178,11 +278,10 @@ st.subheader("🧠 Ask a Question")
 user_input = st.text_input("Type here…")
 
 if user_input:
-    plan = samarth_plan(user_input)
-    answer, df_out = execute_plan(plan)
+    answer, tbl_out = answer_query(" ".join(user_input.lower().split()))
     st.markdown(answer)
-    if df_out is not None:
-        st.dataframe(df_out)
+    if tbl_out is not None:
+        st.dataframe(tbl_out)
 
 # ================================================================
 # END OF FILE
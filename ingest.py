@@ -0,0 +1,61 @@
+# ================================================================
+#   PROJECT SAMARTH — Offline Ingest
+#   Builds samarth.duckdb from the cleaned Parquet files once,
+#   so the Streamlit app only has to open it read-only.
+#
+#   Usage:  python ingest.py
+# ================================================================
+
+import duckdb
+
+DB_PATH = "samarth.duckdb"
+RAIN_PARQUET = "imd_rainfall.parquet"
+CROP_PARQUET = "crop_production.parquet"
+
+
+def build_database(db_path=DB_PATH):
+    con = duckdb.connect(database=db_path, read_only=False)
+
+    # DuckDB reads, cleans and types the Parquet files in a single scan.
+    # Only the columns the app queries are kept (monthly/seasonal rainfall is never read).
+    con.execute(f"""
+        CREATE OR REPLACE TABLE rainfall AS
+        SELECT TRIM(state) AS state,
+               TRY_CAST(year AS INTEGER) AS year,
+               TRY_CAST(annual AS DOUBLE) AS annual,
+               LOWER(TRIM(state)) AS state_lc
+        FROM read_parquet('{RAIN_PARQUET}')
+        WHERE state IS NOT NULL AND year IS NOT NULL;
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TABLE crop AS
+        SELECT TRIM(state) AS state,
+               district,
+               TRIM(crop) AS crop,
+               TRY_CAST(production_mt AS DOUBLE) AS production_mt,
+               TRY_CAST(year AS INTEGER) AS year,
+               LOWER(TRIM(state)) AS state_lc,
+               LOWER(TRIM(crop)) AS crop_lc
+        FROM read_parquet('{CROP_PARQUET}')
+        WHERE state IS NOT NULL AND year IS NOT NULL;
+    """)
+
+    # Pre-aggregated totals for the "Top N crops in <state>" hot path
+    con.execute("""
+        CREATE OR REPLACE TABLE crop_top_by_state AS
+        SELECT state_lc, crop, SUM(production_mt) AS total_prod
+        FROM crop
+        GROUP BY state_lc, crop;
+    """)
+
+    con.execute("CREATE INDEX IF NOT EXISTS idx_rainfall_state_lc ON rainfall(state_lc);")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_crop_state_lc ON crop(state_lc);")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_crop_top_by_state_state_lc ON crop_top_by_state(state_lc);")
+
+    con.execute("CHECKPOINT;")
+    con.close()
+
+
+if __name__ == "__main__":
+    build_database()
+    print(f"✅ {DB_PATH} built from {RAIN_PARQUET} + {CROP_PARQUET}")
@@ -0,0 +1,36 @@
+# ================================================================
+#   PROJECT SAMARTH — Offline Parquet Rewrite
+#   Rewrites the cleaned Parquet files with ZSTD compression,
+#   rows clustered by state/year and bounded row groups, so DuckDB
+#   reads fewer bytes and can skip row groups on state filters.
+#
+#   Usage:  python rewrite_parquet.py   (then re-run python ingest.py)
+# ================================================================
+
+import os
+
+import duckdb
+
+ROW_GROUP_SIZE = 100_000
+
+# file → clustering order
+PARQUET_FILES = {
+    "crop_production.parquet": "state, year, district, crop",
+    "imd_rainfall.parquet": "state, year",
+}
+
+
+def rewrite_parquet(path, order_by):
+    tmp_path = path + ".tmp"
+    duckdb.execute(f"""
+        COPY (SELECT * FROM read_parquet('{path}') ORDER BY {order_by})
+        TO '{tmp_path}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {ROW_GROUP_SIZE});
+    """)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    for path, order_by in PARQUET_FILES.items():
+        before = os.path.getsize(path)
+        rewrite_parquet(path, order_by)
+        print(f"✅ {path}: {before:,} → {os.path.getsize(path):,} bytes")